@@ -1,7 +1,5 @@
 """The Ingenium integration."""
-import asyncio
 import logging
-from typing import Any
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
@@ -14,7 +12,11 @@ from homeassistant.helpers.typing import ConfigType
 
 from ingeniumpy import IngeniumAPI
 from ingeniumpy.objects import IngObject
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_SCHEDULER, DATA_PROFILER, CONF_PROFILE_STARTUP, \
+    DATA_PROFILE_STARTUP
+from .freshness import async_setup_freshness
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +25,7 @@ CONFIG_SCHEMA = vol.Schema({DOMAIN: vol.Schema({
     vol.Optional(CONF_HOST): cv.string,
     vol.Optional(CONF_USERNAME): cv.string,
     vol.Optional(CONF_PASSWORD): cv.string,
+    vol.Optional(CONF_PROFILE_STARTUP, default=False): cv.boolean,
 })}, extra=vol.ALLOW_EXTRA)
 
 PLATFORMS = ["switch", "cover", "sensor", "light", "climate"]
@@ -30,12 +33,17 @@ PLATFORMS = ["switch", "cover", "sensor", "light", "climate"]
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Ingenium component."""
-    hass.data[DOMAIN] = {}
+    hass.data[DOMAIN] = {
+        DATA_PROFILE_STARTUP: config.get(DOMAIN, {}).get(CONF_PROFILE_STARTUP, False),
+    }
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ingenium from a config entry."""
+    profiler = StartupProfiler(hass.data[DOMAIN][DATA_PROFILE_STARTUP])
+    profiler.async_watch_first_state(hass, entry)
+
     api = IngeniumAPI(hass)
 
     if CONF_USERNAME in entry.data and CONF_PASSWORD in entry.data:
@@ -47,18 +55,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     def onchange(x: IngObject) -> None:
         async_dispatcher_send(hass, f"update_{DOMAIN}_{x.address}")
-    await api.load(debug=False, data_dir=data_dir, onchange=onchange)
+    # ingeniumpy starts its proxy and logs in inside load, so login is part of this phase
+    with profiler.phase("api.load"):
+        await api.load(debug=False, data_dir=data_dir, onchange=onchange)
+
+    scheduler = CommandScheduler()
+    entry.async_create_background_task(hass, scheduler.async_run(), f"{DOMAIN} command scheduler")
+
+    with profiler.phase("freshness"):
+        freshness = async_setup_freshness(hass, entry, api, scheduler)
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        DATA_API: api,
+        DATA_FRESHNESS: freshness,
+        DATA_SCHEDULER: scheduler,
+        DATA_PROFILER: profiler,
+    }
 
-    hass.data[DOMAIN][entry.entry_id] = api
+    if "recorder" in hass.config.components:
+        with profiler.phase("meter_statistics"):
+            # Imported here so the recorder stays off the import path when it isn't loaded
+            from .meter_statistics import async_setup_meter_statistics
+            await async_setup_meter_statistics(hass, entry, api, freshness)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    with profiler.phase("forward_entry_setups"):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id][DATA_API]
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
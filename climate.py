@@ -1,5 +1,7 @@
-iimport logging
+import logging
+
 from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
     ClimateEntity,
     ClimateEntityFeature,
     HVACMode,
@@ -8,28 +10,48 @@ from homeassistant.components.climate import (
 )
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from ingeniumpy import IngeniumAPI
 from ingeniumpy.objects import IngThermostat
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_SCHEDULER, DATA_PROFILER
+from .freshness import FreshnessIndex
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler, context_priority
 
 _LOGGER = logging.getLogger(__name__)
 
+# Setpoint and mode changes closer together than this go out as one write
+SETPOINT_COOLDOWN = 1.0
+# Sent values are shown until the device reports them back, or this long
+CONFIRM_TIMEOUT = 30.0
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback
 ):
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([IngClimate(o) for o in api.get_climates()])
+    data = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = data[DATA_API]
+    freshness: FreshnessIndex = data[DATA_FRESHNESS]
+    scheduler: CommandScheduler = data[DATA_SCHEDULER]
+    profiler: StartupProfiler = data[DATA_PROFILER]
+    with profiler.phase("entities.climate"):
+        async_add_entities([IngClimate(o, freshness, scheduler) for o in api.get_climates()])
+
+def _device_set_point(temp: float) -> float:
+    """Set point the device ends up with, ingeniumpy sends it in 0.2 steps."""
+    return int(temp * 5) / 5
 
 class IngClimate(ClimateEntity):
-    def __init__(self, obj: IngThermostat):
+    def __init__(self, obj: IngThermostat, freshness: FreshnessIndex, scheduler: CommandScheduler):
         self._obj = obj
+        self._freshness = freshness
+        self._scheduler = scheduler
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}"
         self._attr_name = obj.component.label
         self._attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT, HVACMode.COOL, HVACMode.HEAT_COOL]
@@ -38,20 +60,94 @@ class IngClimate(ClimateEntity):
         self._attr_max_temp = 51
         self._attr_min_temp = 0
         self._attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+        self._pending_temp: float | None = None
+        self._pending_mode: HVACMode | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._flushing = False
+        self._unsub_confirm: CALLBACK_TYPE | None = None
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_flush)
+        self.async_on_remove(self._async_cancel_confirm)
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
                 f"update_{DOMAIN}_{self._obj.address}",
-                self.async_write_ha_state
+                self._async_device_update
             )
         )
 
+    @callback
+    def _async_device_update(self) -> None:
+        # Drop whatever the device already reports, nothing left to send or confirm for it
+        if self._pending_temp is not None and _device_set_point(self._pending_temp) == self._obj.set_point:
+            self._pending_temp = None
+        if self._pending_mode is not None and self._pending_mode == self._device_hvac_mode:
+            self._pending_mode = None
+        if self._pending_temp is None and self._pending_mode is None:
+            self._async_cancel_confirm()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        # A write in flight picks up later changes itself once it's done
+        if self._unsub_flush is None and not self._flushing:
+            self._unsub_flush = async_call_later(self.hass, SETPOINT_COOLDOWN, self._async_flush)
+
+    @callback
+    def _async_cancel_flush(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    async def _async_flush(self, _now) -> None:
+        self._unsub_flush = None
+        self._flushing = True
+        mode, temp = self._pending_mode, self._pending_temp
+        try:
+            await self._scheduler.run(context_priority(self._context), self._async_send, mode, temp)
+        except Exception:
+            _LOGGER.exception("Error writing %s", self.entity_id)
+            # Nothing to wait for, go back to what the device has
+            if self._pending_mode == mode:
+                self._pending_mode = None
+            if self._pending_temp == temp:
+                self._pending_temp = None
+            self.async_write_ha_state()
+        else:
+            self._async_cancel_confirm()
+            self._unsub_confirm = async_call_later(self.hass, CONFIRM_TIMEOUT, self._async_confirm_timeout)
+        finally:
+            self._flushing = False
+
+        # Changes made while the write was in flight go out in the next one
+        if (self._pending_mode is not None and self._pending_mode != mode) or \
+                (self._pending_temp is not None and self._pending_temp != temp):
+            self._async_schedule_flush()
+
+    @callback
+    def _async_confirm_timeout(self, _now) -> None:
+        self._unsub_confirm = None
+        self._pending_mode = None
+        self._pending_temp = None
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_confirm(self) -> None:
+        if self._unsub_confirm is not None:
+            self._unsub_confirm()
+            self._unsub_confirm = None
+
+    async def _async_send(self, mode: HVACMode | None, temp: float | None) -> None:
+        if mode is not None and mode != self._device_hvac_mode:
+            await self._obj.set_mode(self._attr_hvac_modes.index(mode))
+        if temp is not None and _device_set_point(temp) != self._obj.set_point:
+            await self._obj.set_temp(temp)
+
     @property
     def available(self) -> bool:
-        return self._obj.available
+        return self._obj.available and self._freshness.is_fresh(self._obj.address)
 
     @property
     def current_temperature(self):
@@ -59,10 +155,14 @@ class IngClimate(ClimateEntity):
 
     @property
     def target_temperature(self):
-        return self._obj.set_point
+        return self._pending_temp if self._pending_temp is not None else self._obj.set_point
 
     @property
     def hvac_mode(self) -> HVACMode:
+        return self._pending_mode if self._pending_mode is not None else self._device_hvac_mode
+
+    @property
+    def _device_hvac_mode(self) -> HVACMode:
         return self._attr_hvac_modes[self._obj.get_mode()]
 
     @property
@@ -70,12 +170,19 @@ class IngClimate(ClimateEntity):
         return [HVACAction.OFF, HVACAction.HEATING, HVACAction.COOLING][self._obj.get_action()]
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
-        await self._obj.set_mode(self._attr_hvac_modes.index(hvac_mode))
+        # A new change is waiting to be sent, don't let the old timeout drop it
+        self._async_cancel_confirm()
+        self._pending_mode = hvac_mode
         self.async_write_ha_state()
+        self._async_schedule_flush()
 
     async def async_set_temperature(self, **kwargs) -> None:
-        await self._obj.set_temp(kwargs[ATTR_TEMPERATURE])
+        self._async_cancel_confirm()
+        if ATTR_HVAC_MODE in kwargs:
+            self._pending_mode = kwargs[ATTR_HVAC_MODE]
+        self._pending_temp = kwargs[ATTR_TEMPERATURE]
         self.async_write_ha_state()
+        self._async_schedule_flush()
 
     @property
     def device_info(self):
@@ -1,3 +1,11 @@
 """Constants for the Ingenium integration."""
 
 DOMAIN = "ingenium"
+
+DATA_API = "api"
+DATA_FRESHNESS = "freshness"
+DATA_SCHEDULER = "scheduler"
+DATA_PROFILER = "profiler"
+
+CONF_PROFILE_STARTUP = "profile_startup"
+DATA_PROFILE_STARTUP = "profile_startup"
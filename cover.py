@@ -7,17 +7,27 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from ingeniumpy import IngeniumAPI
 from ingeniumpy.objects import IngActuator
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_SCHEDULER, DATA_PROFILER
+from .freshness import FreshnessIndex
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler, context_priority
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([IngCover(o) for o in api.get_covers()])
+    data = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = data[DATA_API]
+    freshness: FreshnessIndex = data[DATA_FRESHNESS]
+    scheduler: CommandScheduler = data[DATA_SCHEDULER]
+    profiler: StartupProfiler = data[DATA_PROFILER]
+    with profiler.phase("entities.cover"):
+        async_add_entities([IngCover(o, freshness, scheduler) for o in api.get_covers()])
 
 class IngCover(CoverEntity):
-    def __init__(self, obj: IngActuator):
+    def __init__(self, obj: IngActuator, freshness: FreshnessIndex, scheduler: CommandScheduler):
         self._obj = obj
+        self._freshness = freshness
+        self._scheduler = scheduler
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}"
         self._attr_name = obj.component.label
         self._attr_device_class = CoverDeviceClass.BLIND
@@ -29,7 +39,7 @@ class IngCover(CoverEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.available
+        return self._obj.available and self._freshness.is_fresh(self._obj.address)
 
     @property
     def current_cover_position(self):
@@ -40,15 +50,15 @@ class IngCover(CoverEntity):
         return self._obj.get_cover_val() == 0
 
     async def async_open_cover(self, **kwargs):
-        await self._obj.set_cover_val(100)
+        await self._scheduler.run(context_priority(self._context), self._obj.set_cover_val, 100)
         self.async_write_ha_state()
 
     async def async_close_cover(self, **kwargs):
-        await self._obj.set_cover_val(0)
+        await self._scheduler.run(context_priority(self._context), self._obj.set_cover_val, 0)
         self.async_write_ha_state()
 
     async def async_set_cover_position(self, **kwargs):
-        await self._obj.set_cover_val(kwargs[ATTR_POSITION])
+        await self._scheduler.run(context_priority(self._context), self._obj.set_cover_val, kwargs[ATTR_POSITION])
         self.async_write_ha_state()
 
     @property
@@ -0,0 +1,20 @@
+"""Diagnostics support for Ingenium."""
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_SCHEDULER, DATA_PROFILER
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    scheduler: CommandScheduler = data[DATA_SCHEDULER]
+    profiler: StartupProfiler = data[DATA_PROFILER]
+    return {
+        "scheduler": scheduler.metrics(),
+        "startup": profiler.as_dict(),
+    }
@@ -0,0 +1,200 @@
+"""Stale-data detection for Ingenium devices.
+
+Every inbound package refreshes its target address. Addresses that report
+on their own learn their update period, and once they miss a few periods
+they are re-polled individually. Only if the poll also goes unanswered
+for POLL_GRACE are they marked stale (their entities go unavailable).
+One timer wheel, swept periodically, holds every deadline.
+"""
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from ingeniumpy import IngeniumAPI
+from ingeniumpy.objects import (
+    ACTUATOR_BLIND,
+    IngActuator,
+    IngAirSensor,
+    IngMeterBus,
+    IngObject,
+    IngSif,
+    IngThermostat,
+    Package,
+)
+
+from .const import DOMAIN
+from .scheduler import CommandScheduler, PRIORITY_BACKGROUND
+
+_LOGGER = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 5.0
+WHEEL_SLOTS = 64
+
+# Packages closer together than this are one report (e.g. all meter channels)
+BURST_WINDOW = 2.0
+# Intervals needed before an address can go stale at all
+MIN_SAMPLES = 3
+EWMA_ALPHA = 0.2
+STALE_FACTOR = 3
+MIN_TIMEOUT = 60.0
+MAX_TIMEOUT = 3 * 3600.0
+# How long a re-poll has to be answered before the address goes stale
+POLL_GRACE = 30.0
+
+
+class FreshnessIndex:
+    """Last-update time and learned period per address, on a timer wheel."""
+
+    def __init__(self, tick: float = SWEEP_INTERVAL, slots: int = WHEEL_SLOTS):
+        self._tick_len = tick
+        self._origin = time.monotonic()
+        self._tick = 0
+        self._wheel: List[Set[int]] = [set() for _ in range(slots)]
+        self._deadline: Dict[int, int] = {}
+        # Start of the latest report, only moves once BURST_WINDOW has passed
+        self._anchor: Dict[int, float] = {}
+        self._period: Dict[int, float] = {}
+        self._samples: Dict[int, int] = {}
+        self._polled: Set[int] = set()
+        self._stale: Set[int] = set()
+
+    def track(self, address: int):
+        self._samples.setdefault(address, 0)
+
+    def is_fresh(self, address: int) -> bool:
+        return address not in self._stale
+
+    def timeout(self, address: int) -> float:
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, STALE_FACTOR * self._period.get(address, 0)))
+
+    def touch(self, address: int, now: Optional[float] = None) -> bool:
+        """Record traffic for address. Returns True if it was stale until now."""
+        if address not in self._samples:
+            return False
+
+        now = time.monotonic() if now is None else now
+        anchor = self._anchor.get(address)
+
+        revived = address in self._stale
+        if address in self._polled or revived:
+            # The gap is our timeout or the outage, not the device's period
+            self._polled.discard(address)
+            self._stale.discard(address)
+            self._anchor[address] = now
+        elif anchor is None or now - anchor >= BURST_WINDOW:
+            # Measured from the start of the previous report, not its last
+            # package, so a device sending faster than BURST_WINDOW still
+            # learns a period
+            self._anchor[address] = now
+            if anchor is not None:
+                interval = now - anchor
+                period = self._period.get(address)
+                self._period[address] = interval if period is None else period + EWMA_ALPHA * (interval - period)
+                self._samples[address] += 1
+
+        if self._samples[address] >= MIN_SAMPLES:
+            self._schedule(address, now + self.timeout(address))
+        return revived
+
+    def sweep(self, now: Optional[float] = None) -> Tuple[List[int], List[int]]:
+        """Advance the wheel. Returns the addresses to poll and those gone stale.
+
+        An address past its deadline is polled and given POLL_GRACE to
+        answer. If it doesn't, it goes stale and is polled again one
+        timeout later, so a device that stays silent is retried at its
+        own pace.
+        """
+        now = time.monotonic() if now is None else now
+        current = int((now - self._origin) / self._tick_len)
+        poll = []
+        stale = []
+
+        for tick in range(self._tick + 1, min(current, self._tick + len(self._wheel)) + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            for address in [a for a in slot if self._deadline[a] <= current]:
+                if address in self._polled:
+                    self._polled.discard(address)
+                    if address not in self._stale:
+                        self._stale.add(address)
+                        stale.append(address)
+                    self._schedule(address, now + self.timeout(address))
+                else:
+                    self._polled.add(address)
+                    poll.append(address)
+                    self._schedule(address, now + POLL_GRACE)
+
+        self._tick = max(self._tick, current)
+        return poll, stale
+
+    def _schedule(self, address: int, when: float):
+        old = self._deadline.get(address)
+        if old is not None:
+            self._wheel[old % len(self._wheel)].discard(address)
+
+        tick = max(self._tick + 1, math.ceil((when - self._origin) / self._tick_len))
+        self._deadline[address] = tick
+        self._wheel[tick % len(self._wheel)].add(address)
+
+
+def poll_package(obj: IngObject) -> Optional[Package]:
+    """Read request for obj, the same one ingeniumpy's initial read sends."""
+    if isinstance(obj, (IngThermostat, IngMeterBus, IngSif)) or \
+            (isinstance(obj, IngActuator) and obj.mode == ACTUATOR_BLIND):
+        return Package(0xFFFF, obj.address, 10, 0, 0)
+    if isinstance(obj, IngAirSensor):
+        # A read to data1 10 also does reads for 11-13
+        return Package(0xFFFF, obj.address, 3, 10, 0)
+    return None
+
+
+def async_setup_freshness(hass: HomeAssistant, entry: ConfigEntry, api: IngeniumAPI,
+                          scheduler: CommandScheduler) -> FreshnessIndex:
+    """Track the pollable devices of api and re-poll them when they go stale."""
+    freshness = FreshnessIndex()
+    polls: Dict[int, Package] = {}
+    for obj in api.objects:
+        package = poll_package(obj)
+        if package is not None:
+            polls[obj.address] = package
+            freshness.track(obj.address)
+
+    # onchange only fires when a value changes, so a device repeating the same
+    # reading would look silent. Hook the package handler of the connection
+    # to see every inbound package instead. This relies on ingeniumpy 0.9.1
+    # internals: CustomConnection._notify_package, awaited for each package.
+    # The direct connection handles packages in CustomProtocol, re-created
+    # on every reconnect, so it can't be hooked this way.
+    connection = api.connection
+    notify_package = getattr(connection, "_notify_package", None)
+    if notify_package is None:
+        _LOGGER.warning("Can't observe inbound packages on %s, stale device detection is disabled",
+                        type(connection).__name__)
+        return freshness
+
+    async def _notify_package(p: Package) -> None:
+        # Only the device reports ingeniumpy handles, a read request to a dead
+        # device (ours echoed back, or another master's) says nothing about it
+        if p.command in (4, 23) and freshness.touch(p.target):
+            async_dispatcher_send(hass, f"update_{DOMAIN}_{p.target}")
+        await notify_package(p)
+
+    connection._notify_package = _notify_package
+
+    async def _sweep(now) -> None:
+        poll, stale = freshness.sweep()
+        for address in stale:
+            _LOGGER.debug("Poll of %s unanswered, marking unavailable", address)
+            async_dispatcher_send(hass, f"update_{DOMAIN}_{address}")
+        for address in poll:
+            _LOGGER.debug("No updates from %s, polling", address)
+            await scheduler.run(PRIORITY_BACKGROUND, api.send, polls[address])
+
+    entry.async_on_unload(async_track_time_interval(hass, _sweep, timedelta(seconds=SWEEP_INTERVAL)))
+    return freshness
@@ -7,17 +7,27 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from ingeniumpy import IngeniumAPI
 from ingeniumpy.objects import IngBusingRegulator
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_SCHEDULER, DATA_PROFILER
+from .freshness import FreshnessIndex
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler, context_priority
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([IngRegulator(o) for o in api.get_lights()])
+    data = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = data[DATA_API]
+    freshness: FreshnessIndex = data[DATA_FRESHNESS]
+    scheduler: CommandScheduler = data[DATA_SCHEDULER]
+    profiler: StartupProfiler = data[DATA_PROFILER]
+    with profiler.phase("entities.light"):
+        async_add_entities([IngRegulator(o, freshness, scheduler) for o in api.get_lights()])
 
 class IngRegulator(LightEntity):
-    def __init__(self, obj: IngBusingRegulator):
+    def __init__(self, obj: IngBusingRegulator, freshness: FreshnessIndex, scheduler: CommandScheduler):
         self._obj = obj
+        self._freshness = freshness
+        self._scheduler = scheduler
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}"
         self._attr_name = obj.component.label
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
@@ -30,7 +40,7 @@ class IngRegulator(LightEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.available
+        return self._obj.available and self._freshness.is_fresh(self._obj.address)
 
     @property
     def brightness(self):
@@ -42,11 +52,11 @@ class IngRegulator(LightEntity):
 
     async def async_turn_on(self, **kwargs):
         brightness = kwargs.get("brightness", 255)
-        await self._obj.set_value(self._obj.component.output, brightness)
+        await self._scheduler.run(context_priority(self._context), self._obj.set_value, self._obj.component.output, brightness)
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
-        await self._obj.set_value(self._obj.component.output, 0)
+        await self._scheduler.run(context_priority(self._context), self._obj.set_value, self._obj.component.output, 0)
         self.async_write_ha_state()
 
     @property
@@ -0,0 +1,243 @@
+"""Hourly long-term statistics for meter channels.
+
+Meter readings are aggregated in memory into time-weighted hourly
+mean/min/max, plus an energy sum for power channels, and bulk-imported as
+external statistics. This replaces the recorder compiling them from every
+state change, which is costly for these high-rate channels and loses the
+running energy total across restarts. The open hour is kept in storage
+over a restart or reload and picked up again.
+"""
+import logging
+import math
+from typing import Callable, Dict, List, Optional
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, UnitOfApparentPower, UnitOfElectricCurrent, UnitOfElectricPotential, \
+    UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from ingeniumpy import IngeniumAPI
+
+from .const import DOMAIN
+from .freshness import FreshnessIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+HOUR = 3600
+# W·s in a kWh
+WS_PER_KWH = 3_600_000
+
+
+class ChannelStatistics:
+    """Time-weighted hourly aggregate of one meter channel.
+
+    Readings are a step function: each value holds until the next one, so
+    the mean weights it by how long it held and power integrates to energy.
+    """
+
+    def __init__(self, statistic_id: str, name: str, unit: str, read: Callable[[], Optional[float]],
+                 energy: bool = False):
+        self.statistic_id = statistic_id
+        self.name = name
+        self.unit = unit
+        self.read = read
+        self.energy_id = f"{statistic_id}_energy" if energy else None
+
+        self.value: Optional[float] = None
+        self.since: Optional[float] = None
+        self.hour_start: Optional[float] = None
+        self.weighted = 0.0
+        self.duration = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.hour_energy = 0.0
+        self.energy_sum = 0.0
+
+        self.closed: List[StatisticData] = []
+        self.closed_energy: List[StatisticData] = []
+
+    def sample(self, now: float):
+        """Account for the value held until now, then take a fresh reading."""
+        if self.hour_start is None:
+            self.hour_start = math.floor(now / HOUR) * HOUR
+        while now >= self.hour_start + HOUR:
+            self._close_hour()
+
+        self._integrate(now)
+        self.value = self.read()
+        if self.value is not None:
+            self.min = self.value if self.min is None else min(self.min, self.value)
+            self.max = self.value if self.max is None else max(self.max, self.value)
+
+    def _integrate(self, until: float):
+        if self.value is not None and self.since is not None and until > self.since:
+            held = until - self.since
+            self.weighted += self.value * held
+            self.duration += held
+            if self.energy_id is not None:
+                self.hour_energy += self.value * held / WS_PER_KWH
+        self.since = until
+
+    def _close_hour(self):
+        end = self.hour_start + HOUR
+        self._integrate(end)
+        start = dt_util.utc_from_timestamp(self.hour_start)
+
+        if self.duration > 0:
+            self.closed.append(StatisticData(
+                start=start, mean=self.weighted / self.duration, min=self.min, max=self.max
+            ))
+            if self.energy_id is not None:
+                self.energy_sum += self.hour_energy
+                self.closed_energy.append(StatisticData(start=start, sum=self.energy_sum))
+
+        # The current value carries over into the next hour
+        self.hour_start = end
+        self.weighted = 0.0
+        self.duration = 0.0
+        self.hour_energy = 0.0
+        self.min = self.max = self.value
+
+    def as_dict(self) -> dict:
+        """The open hour, as accounted up to the last sample."""
+        return {
+            "hour_start": self.hour_start,
+            "weighted": self.weighted,
+            "duration": self.duration,
+            "min": self.min,
+            "max": self.max,
+            "hour_energy": self.hour_energy,
+        }
+
+    def restore(self, data: dict):
+        """Resume an open hour saved by as_dict, before the first sample.
+
+        The time the integration was down isn't accounted for, the mean
+        only covers what was observed.
+        """
+        self.hour_start = data["hour_start"]
+        self.weighted = data["weighted"]
+        self.duration = data["duration"]
+        self.min = data["min"]
+        self.max = data["max"]
+        self.hour_energy = data["hour_energy"]
+
+    def metadata(self) -> StatisticMetaData:
+        return StatisticMetaData(
+            has_mean=True, has_sum=False, name=self.name, source=DOMAIN,
+            statistic_id=self.statistic_id, unit_of_measurement=self.unit,
+        )
+
+    def energy_metadata(self) -> StatisticMetaData:
+        return StatisticMetaData(
+            has_mean=False, has_sum=True, name=f"{self.name} energy", source=DOMAIN,
+            statistic_id=self.energy_id, unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+
+
+def _statistic_id(component_id: str, suffix: str) -> str:
+    return f"{DOMAIN}:{slugify(f'{component_id}_{suffix}')}"
+
+
+def meter_channels(api: IngeniumAPI, freshness: FreshnessIndex) -> Dict[int, List[ChannelStatistics]]:
+    """Channels of MeterBusSensor and SockSensor, grouped by device address.
+
+    A channel reads None while its sensor is unavailable, so a stalled
+    device doesn't keep its last value adding up.
+    """
+    channels: Dict[int, List[ChannelStatistics]] = {}
+
+    for o, i in api.get_meterbuses():
+        channels.setdefault(o.address, []).append(ChannelStatistics(
+            _statistic_id(o.component.id, f"C{i}"), f"{o.component.label} C{i}", UnitOfPower.WATT,
+            lambda _o=o, _i=i: (
+                _o.get_value(_i) if _o.get_available(_i) and freshness.is_fresh(_o.address) else None
+            ),
+            energy=True,
+        ))
+
+    sock_modes = [
+        ("I", "current", UnitOfElectricCurrent.AMPERE, False),
+        ("V", "voltage", UnitOfElectricPotential.VOLT, False),
+        ("PA", "active_power", UnitOfPower.WATT, True),
+        ("P", "consumption", UnitOfApparentPower.VOLT_AMPERE, False),
+    ]
+    for o in api.get_switches():
+        if not o.is_sock:
+            continue
+        for name, attr, unit, energy in sock_modes:
+            channels.setdefault(o.address, []).append(ChannelStatistics(
+                _statistic_id(o.component.id, name), f"{o.component.label} {name}", unit,
+                lambda _o=o, _attr=attr: (
+                    getattr(_o, _attr)
+                    if _o.available and freshness.is_fresh(_o.address) and getattr(_o, _attr) != -1 else None
+                ),
+                energy=energy,
+            ))
+
+    return channels
+
+
+async def async_setup_meter_statistics(hass: HomeAssistant, entry: ConfigEntry, api: IngeniumAPI,
+                                       freshness: FreshnessIndex) -> None:
+    """Aggregate meter channels and import their statistics every hour."""
+    channels = meter_channels(api, freshness)
+    if not channels:
+        return
+
+    # Continue the energy totals from what was imported before the restart
+    recorder = get_instance(hass)
+    for channel in (c for cs in channels.values() for c in cs if c.energy_id is not None):
+        last = await recorder.async_add_executor_job(
+            get_last_statistics, hass, 1, channel.energy_id, True, {"sum"}
+        )
+        if last.get(channel.energy_id):
+            channel.energy_sum = last[channel.energy_id][0]["sum"] or 0.0
+
+    # An hour that ended while we were down is closed by the first sample,
+    # and imported with the next ones
+    store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.meter_statistics.{entry.entry_id}")
+    open_hours = await store.async_load() or {}
+    now = dt_util.utcnow().timestamp()
+    for channel in (c for cs in channels.values() for c in cs):
+        if channel.statistic_id in open_hours:
+            channel.restore(open_hours[channel.statistic_id])
+        channel.sample(now)
+
+    for address, address_channels in channels.items():
+        @callback
+        def _sample(_channels=address_channels) -> None:
+            now = dt_util.utcnow().timestamp()
+            for channel in _channels:
+                channel.sample(now)
+
+        entry.async_on_unload(async_dispatcher_connect(hass, f"update_{DOMAIN}_{address}", _sample))
+
+    @callback
+    def _import(utc_now) -> None:
+        now = utc_now.timestamp()
+        for channel in (c for cs in channels.values() for c in cs):
+            channel.sample(now)
+            if channel.closed:
+                async_add_external_statistics(hass, channel.metadata(), channel.closed)
+                channel.closed = []
+            if channel.closed_energy:
+                async_add_external_statistics(hass, channel.energy_metadata(), channel.closed_energy)
+                channel.closed_energy = []
+
+    async def _async_save(_event=None) -> None:
+        _import(dt_util.utcnow())
+        await store.async_save({c.statistic_id: c.as_dict() for cs in channels.values() for c in cs})
+
+    entry.async_on_unload(async_track_utc_time_change(hass, _import, minute=0, second=10))
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_save))
+    entry.async_on_unload(_async_save)
@@ -0,0 +1,73 @@
+"""Opt-in startup profiling for Ingenium.
+
+Enabled with ``profile_startup: true`` under ``ingenium:`` in
+configuration.yaml. Phase timings end up in the config entry diagnostics.
+Import time isn't one of them, measure it with ``python -X importtime``.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+
+class StartupProfiler:
+    """Durations of named setup phases, plus milestones since setup began."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self._unsub_first_state: Optional[CALLBACK_TYPE] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def mark(self, name: str):
+        if self.enabled and name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+
+    @callback
+    def async_watch_first_state(self, hass: HomeAssistant, entry: ConfigEntry):
+        """Mark when the first entity of entry writes its state."""
+        if not self.enabled:
+            return
+        registry = er.async_get(hass)
+
+        @callback
+        def _is_ours(event: Event) -> bool:
+            entity = registry.async_get(event.data["entity_id"])
+            return entity is not None and entity.config_entry_id == entry.entry_id
+
+        @callback
+        def _first_state(event: Event) -> None:
+            self.mark("first_state_write")
+            self._async_stop_watching()
+
+        self._unsub_first_state = hass.bus.async_listen(EVENT_STATE_CHANGED, _first_state, event_filter=_is_ours)
+        entry.async_on_unload(self._async_stop_watching)
+
+    @callback
+    def _async_stop_watching(self):
+        if self._unsub_first_state is not None:
+            self._unsub_first_state()
+            self._unsub_first_state = None
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "phases_ms": {name: seconds * 1000 for name, seconds in self.phases.items()},
+            "marks_ms": {name: seconds * 1000 for name, seconds in self.marks.items()},
+        }
@@ -0,0 +1,131 @@
+"""Command scheduling for an Ingenium bus.
+
+Every command for a bus goes through one CommandScheduler, which runs them
+one at a time under a token-bucket rate limit, highest priority first, so
+a burst of automation traffic can't hold back someone using the UI.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from homeassistant.core import Context
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AUTOMATION = 1
+# Our own re-polls, behind anything a user or an automation asked for
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = ["interactive", "automation", "background"]
+
+COMMAND_RATE = 10.0
+COMMAND_BURST = 10
+
+
+def context_priority(context: Optional[Context]) -> int:
+    """Interactive for calls a user made directly, automation for the rest."""
+    if context is not None and context.user_id is not None and context.parent_id is None:
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_AUTOMATION
+
+
+class PriorityStats:
+    """Queue-wait and execution-time totals for one priority class."""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "wait_mean_ms": self.wait_total / self.count * 1000 if self.count else 0,
+            "wait_max_ms": self.wait_max * 1000,
+            "exec_mean_ms": self.exec_total / self.count * 1000 if self.count else 0,
+            "exec_max_ms": self.exec_max * 1000,
+        }
+
+
+class CommandScheduler:
+    def __init__(self, rate: float = COMMAND_RATE, burst: int = COMMAND_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._queue: List[Tuple[int, int, float, asyncio.Future, Callable[..., Awaitable[Any]], tuple]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.stats = [PriorityStats() for _ in PRIORITY_NAMES]
+
+    async def run(self, priority: int, command: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Queue command(*args) and wait for its turn on the bus and its result."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), time.monotonic(), future, command, args))
+        self._wakeup.set()
+        return await future
+
+    async def async_run(self):
+        """Serve the queue until cancelled."""
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                # Pop only once a token is available, so anything more urgent
+                # queued while we waited still goes first
+                await self._take_token()
+                priority, _, queued, future, command, args = heapq.heappop(self._queue)
+                if future.cancelled():
+                    continue
+
+                stats = self.stats[priority]
+                start = time.monotonic()
+                stats.count += 1
+                stats.wait_total += start - queued
+                stats.wait_max = max(stats.wait_max, start - queued)
+                try:
+                    result = await command(*args)
+                except asyncio.CancelledError:
+                    # Stopped mid-command, its caller is waiting on future too
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    stats.failed += 1
+                    if not future.cancelled():
+                        future.set_exception(e)
+                else:
+                    if not future.cancelled():
+                        future.set_result(result)
+                finally:
+                    elapsed = time.monotonic() - start
+                    stats.exec_total += elapsed
+                    stats.exec_max = max(stats.exec_max, elapsed)
+        finally:
+            for _, _, _, future, _, _ in self._queue:
+                future.cancel()
+            self._queue = []
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def metrics(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "queued": len(self._queue),
+            "priorities": {name: stats.as_dict() for name, stats in zip(PRIORITY_NAMES, self.stats)},
+        }
@@ -21,24 +21,31 @@ from ingeniumpy.objects import (
     IngAirSensor, IngActuator, IngNoiseSensor
 )
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_PROFILER
+from .freshness import FreshnessIndex
+from .profiler import StartupProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
-
-    async_add_entities([MeterBusSensor(o, i) for o, i in api.get_meterbuses()])
-    async_add_entities([SifSensor(o, i) for o, i in api.get_sifs()])
-    async_add_entities([AirSensor(o, i) for o, i in api.get_air_sensors()])
-    async_add_entities([NoiseSensor(o) for o in api.get_noise_sensors()])
-    async_add_entities([SockSensor(o, i) for o in api.get_switches() if o.is_sock for i in range(4)])
+    data = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = data[DATA_API]
+    freshness: FreshnessIndex = data[DATA_FRESHNESS]
+    profiler: StartupProfiler = data[DATA_PROFILER]
+
+    with profiler.phase("entities.sensor"):
+        async_add_entities([MeterBusSensor(o, i, freshness) for o, i in api.get_meterbuses()])
+        async_add_entities([SifSensor(o, i, freshness) for o, i in api.get_sifs()])
+        async_add_entities([AirSensor(o, i, freshness) for o, i in api.get_air_sensors()])
+        async_add_entities([NoiseSensor(o, freshness) for o in api.get_noise_sensors()])
+        async_add_entities([SockSensor(o, i, freshness) for o in api.get_switches() if o.is_sock for i in range(4)])
 
 class MeterBusSensor(SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    # No state class: long-term statistics are imported by meter_statistics
 
-    def __init__(self, obj: IngMeterBus, channel: int):
+    def __init__(self, obj: IngMeterBus, channel: int, freshness: FreshnessIndex):
         self._obj = obj
+        self._freshness = freshness
         self._channel = channel
         self._attr_name = f"{obj.component.label} C{self._channel}"
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}_C{channel}"
@@ -52,7 +59,7 @@ class MeterBusSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.get_available(self._channel)
+        return self._obj.get_available(self._channel) and self._freshness.is_fresh(self._obj.address)
 
     @property
     def native_value(self):
@@ -65,8 +72,9 @@ class MeterBusSensor(SensorEntity):
 class SifSensor(SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, obj: IngSif, mode: int):
+    def __init__(self, obj: IngSif, mode: int, freshness: FreshnessIndex):
         self._obj = obj
+        self._freshness = freshness
         self._mode = mode
         modes_names = ["T", "S", "P", "L", "H"]
         self._attr_name = f"{obj.component.label} {modes_names[mode]}"
@@ -89,7 +97,7 @@ class SifSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.get_available(self._mode)
+        return self._obj.get_available(self._mode) and self._freshness.is_fresh(self._obj.address)
 
     @property
     def native_value(self):
@@ -106,8 +114,9 @@ class SifSensor(SensorEntity):
 class AirSensor(SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, obj: IngAirSensor, mode: int):
+    def __init__(self, obj: IngAirSensor, mode: int, freshness: FreshnessIndex):
         self._obj = obj
+        self._freshness = freshness
         self._mode = mode
         modes = ["CO2", "VOCs", "Temp", "Hum"]
         self._attr_name = f"{obj.component.label} {modes[mode]}"
@@ -132,7 +141,7 @@ class AirSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.get_available(self._mode)
+        return self._obj.get_available(self._mode) and self._freshness.is_fresh(self._obj.address)
 
     @property
     def native_value(self):
@@ -152,8 +161,9 @@ class NoiseSensor(SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS
 
-    def __init__(self, obj: IngNoiseSensor):
+    def __init__(self, obj: IngNoiseSensor, freshness: FreshnessIndex):
         self._obj = obj
+        self._freshness = freshness
         self._attr_name = obj.component.label
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}"
 
@@ -164,7 +174,7 @@ class NoiseSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.get_available()
+        return self._obj.get_available() and self._freshness.is_fresh(self._obj.address)
 
     @property
     def native_value(self):
@@ -184,10 +194,11 @@ class NoiseSensor(SensorEntity):
         return self._obj.get_info()
 
 class SockSensor(SensorEntity):
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    # No state class: long-term statistics are imported by meter_statistics
 
-    def __init__(self, obj: IngActuator, mode: int):
+    def __init__(self, obj: IngActuator, mode: int, freshness: FreshnessIndex):
         self._obj = obj
+        self._freshness = freshness
         self._mode = mode
         modes_names = ["I", "V", "PA", "P"]
         self._attr_name = f"{obj.component.label} {modes_names[mode]}"
@@ -212,7 +223,7 @@ class SockSensor(SensorEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.available
+        return self._obj.available and self._freshness.is_fresh(self._obj.address)
 
     @property
     def native_value(self):
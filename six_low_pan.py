@@ -1,123 +1,177 @@
 import asyncio
 import datetime
+import importlib
 import json
+import logging
 from collections import deque
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 
 from ingeniumpy import IngeniumAPI
-from ingeniumpy.objects import IngSif, IngAirSensor, IngComponent, IngMeterBus, IngActuator, \
-    IngBusingRegulator
-import serial_asyncio
+from ingeniumpy.objects import IngSif, IngAirSensor, IngMeterBus, IngActuator, IngBusingRegulator, IngObject
+
+_LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "ingenium"
 
 SIXLOWPAN_ENABLED = False
-DEBUG = True
 SERIAL_PORT = "/dev/ttyS6LP"
+SERIAL_BAUDRATE = 115200
+
+dumps = json.JSONEncoder().encode
+
+
+def frame_head(frame_type: str, identifier: str, name: str) -> str:
+    """Static part of a frame, open for the value fields to be appended."""
+    return json.dumps({"type": frame_type, "id": identifier, "name": name})[:-1] + ', "value": '
+
 
 class SixLowPan:
-    def __init__(self, hass: HomeAssistant, config: ConfigType):
+    def __init__(self, hass: HomeAssistant, config: ConfigType,
+                 port: str = SERIAL_PORT, baudrate: int = SERIAL_BAUDRATE):
         self.hass = hass
         self.config = config
+        self.port = port
+        self.baudrate = baudrate
         self.api: Optional[IngeniumAPI] = None
         self.write_queue: deque = deque(maxlen=256)
+        self.write_event = asyncio.Event()
         self.serial_reader: Optional[asyncio.StreamReader] = None
         self.serial_writer: Optional[asyncio.StreamWriter] = None
+        self.serial_asyncio = None
         self.last_updates: Dict[str, datetime.datetime] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.notify: Dict[IngObject, List[Callable[[], None]]] = {}
 
     async def async_init(self, api: IngeniumAPI):
         self.api = api
 
-        for o, c, i in api.get_sifs():
-            c.add_update_notify(lambda _o=o, _c=c, _i=i: self.update_multisensor(_o, _c, _i))
-        for o, c, i in api.get_meterbuses():
-            c.add_update_notify(lambda _o=o, _c=c, _i=i: self.update_meterbus(_o, _c, _i))
-        for o, c, i in api.get_air_sensors():
-            c.add_update_notify(lambda _o=o, _c=c, _i=i: self.update_air_sensor(_o, _c, _i))
-        for o, c in api.get_switches():
-            c.add_update_notify(lambda _o=o, _c=c: self.update_actuator(_o, _c))
-        for o, c in api.get_lights():
-            c.add_update_notify(lambda _o=o, _c=c: self.update_dimmer(_o, _c))
-
-        self.hass.loop.create_task(self.async_read_loop())
-        self.hass.loop.create_task(self.async_write_loop())
-
-    async def update_multisensor(self, obj: IngSif, comp: IngComponent, mode: int):
-        modes_names = ["T", None, "P", "L", "H"]
-        identifier = f"{DOMAIN}.{comp.id}_{modes_names[mode]}"
-        name = f"{comp.label} {modes_names[mode]}"
-        value = obj.get_value(mode)
-
-        j = json.dumps({"type": "MUL", "id": identifier, "name": name, "value": value})
-        await self.async_write_string(j)
-
-    async def update_meterbus(self, obj: IngMeterBus, comp: IngComponent, channel: int):
-        identifier = f"{DOMAIN}.{comp.id}_C{channel}"
-        name = f"{comp.label} C{channel}"
-        value = obj.get_cons(channel)
-
-        j = json.dumps({"type": "MET", "id": identifier, "name": name, "value": value})
-        await self.async_write_string(j)
-
-    async def update_air_sensor(self, obj: IngAirSensor, comp: IngComponent, mode: int):
-        measurements = ["CO2", "VOCs"]
-        identifier = f"{DOMAIN}.{comp.id}_{measurements[mode].lower()}"
-        name = f"{comp.label} {measurements[mode]}"
-        value = obj.get_value(mode)
-
-        j = json.dumps({"type": "AIR", "id": identifier, "name": name, "value": value})
-        await self.async_write_string(j)
-
-    async def update_actuator(self, obj: IngActuator, comp: IngComponent):
-        identifier = f"{DOMAIN}.{comp.id}"
-        name = comp.label
-        is_on = obj.get_switch_val(comp)
-
-        j = json.dumps({
-            "type": "ACT", 
-            "id": identifier, 
-            "name": name, 
-            "value": is_on, 
-            "consumption": obj.consumption,
-            "voltage": obj.voltage, 
-            "current": obj.current, 
-            "active_power": obj.active_power
-        })
-        await self.async_write_string(j)
-
-    async def update_dimmer(self, obj: IngBusingRegulator, comp: IngComponent):
-        identifier = f"{DOMAIN}.{comp.id}"
-        name = comp.label
-        value = obj.get_value(comp.output)
-
-        j = json.dumps({"type": "DIM", "id": identifier, "name": name, "value": value})
-        await self.async_write_string(j)
-
-    async def async_write_string(self, data: str):
-        if DEBUG:
-            print(f"SEND {data}")
+        for o, i in api.get_sifs():
+            self.add_notify(o, self.update_multisensor(o, i))
+        for o, i in api.get_meterbuses():
+            self.add_notify(o, self.update_meterbus(o, i))
+        for o, i in api.get_air_sensors():
+            self.add_notify(o, self.update_air_sensor(o, i))
+        for o in api.get_switches():
+            self.add_notify(o, self.update_actuator(o))
+        for o in api.get_lights():
+            self.add_notify(o, self.update_dimmer(o))
+
+        # ingeniumpy 0.9.1 has a single onchange hook per API, set by the
+        # integration in api.load. Chain ours after it.
+        onchange = api._onchange
+
+        def _onchange(obj: IngObject) -> None:
+            if onchange is not None:
+                onchange(obj)
+            for notify in self.notify.get(obj, ()):
+                notify()
+
+        api._onchange = _onchange
+
+        await self.async_start()
+
+    def add_notify(self, obj: IngObject, notify: Callable[[], None]):
+        self.notify.setdefault(obj, []).append(notify)
+
+    async def async_start(self):
+        # pyserial is only needed once the link is in use. Import it in the
+        # executor, its first import would block the event loop.
+        if self.serial_asyncio is None:
+            self.serial_asyncio = await self.hass.loop.run_in_executor(None, importlib.import_module, "serial_asyncio")
+        self.tasks = [
+            self.hass.loop.create_task(self.async_read_loop()),
+            self.hass.loop.create_task(self.async_write_loop()),
+        ]
+
+    async def async_stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.close_serial()
+
+    def close_serial(self):
+        if self.serial_writer is not None:
+            self.serial_writer.close()
+        self.serial_reader = None
+        self.serial_writer = None
+
+    def update_multisensor(self, obj: IngSif, mode: int) -> Callable[[], None]:
+        modes_names = ["T", "S", "P", "L", "H"]
+        comp = obj.component
+        head = frame_head("MUL", f"{DOMAIN}.{comp.id}_{modes_names[mode]}", f"{comp.label} {modes_names[mode]}")
+
+        def notify():
+            self.write_string(head + dumps(obj.get_value(mode)) + "}")
+        return notify
+
+    def update_meterbus(self, obj: IngMeterBus, channel: int) -> Callable[[], None]:
+        comp = obj.component
+        head = frame_head("MET", f"{DOMAIN}.{comp.id}_C{channel}", f"{comp.label} C{channel}")
+
+        def notify():
+            self.write_string(head + dumps(obj.get_value(channel)) + "}")
+        return notify
+
+    def update_air_sensor(self, obj: IngAirSensor, mode: int) -> Callable[[], None]:
+        measurements = ["CO2", "VOCs", "Temp", "Hum"]
+        comp = obj.component
+        head = frame_head("AIR", f"{DOMAIN}.{comp.id}_{measurements[mode].lower()}",
+                          f"{comp.label} {measurements[mode]}")
+
+        def notify():
+            self.write_string(head + dumps(obj.get_value(mode)) + "}")
+        return notify
+
+    def update_actuator(self, obj: IngActuator) -> Callable[[], None]:
+        comp = obj.component
+        head = frame_head("ACT", f"{DOMAIN}.{comp.id}", comp.label)
+
+        def notify():
+            self.write_string(
+                head + dumps(obj.get_switch_val())
+                + ', "consumption": ' + dumps(obj.consumption)
+                + ', "voltage": ' + dumps(obj.voltage)
+                + ', "current": ' + dumps(obj.current)
+                + ', "active_power": ' + dumps(obj.active_power) + "}"
+            )
+        return notify
+
+    def update_dimmer(self, obj: IngBusingRegulator) -> Callable[[], None]:
+        comp = obj.component
+        head = frame_head("DIM", f"{DOMAIN}.{comp.id}", comp.label)
+
+        def notify():
+            self.write_string(head + dumps(obj.get_value(comp.output)) + "}")
+        return notify
+
+    def write_string(self, data: str):
+        _LOGGER.debug("SEND %s", data)
         self.write_queue.append((data + "\r\n").encode())
+        self.write_event.set()
 
     async def async_read_loop(self):
         while True:
             try:
                 if self.serial_reader is None:
-                    self.serial_reader, self.serial_writer = await serial_asyncio.open_serial_connection(
-                        url=SERIAL_PORT, baudrate=115200
+                    self.serial_reader, self.serial_writer = await self.serial_asyncio.open_serial_connection(
+                        url=self.port, baudrate=self.baudrate
                     )
-                    print("# Serial Open #")
+                    _LOGGER.debug("Serial port %s open", self.port)
 
                 line = await self.serial_reader.readline()
-                if DEBUG:
-                    print(f"READ {line.decode().strip()}")
+                if not line:
+                    raise ConnectionError("serial port closed")
+                _LOGGER.debug("READ %s", line.decode().strip())
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Exception in serial read loop: {e}")
+                _LOGGER.warning("Exception in serial read loop: %s", e)
+                self.close_serial()
                 await asyncio.sleep(1)
 
     async def async_write_loop(self):
@@ -128,7 +182,8 @@ class SixLowPan:
                     continue
 
                 if len(self.write_queue) == 0:
-                    await asyncio.sleep(0.1)
+                    self.write_event.clear()
+                    await self.write_event.wait()
                     continue
 
                 item = self.write_queue.popleft()
@@ -138,7 +193,7 @@ class SixLowPan:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Exception in serial write loop: {e}")
+                _LOGGER.warning("Exception in serial write loop: %s", e)
                 await asyncio.sleep(1)
 
 if SIXLOWPAN_ENABLED:
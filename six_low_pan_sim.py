@@ -0,0 +1,350 @@
+"""Pseudo-terminal stand-in for the 6LoWPAN serial link.
+
+Runs SixLowPan against a local pty pair instead of /dev/ttyS6LP, with a
+simulated remote node on the other end, and reports latency, throughput,
+overload, reconnect and update fan-out numbers for the link:
+
+    python -m custom_components.ingenium.six_low_pan_sim --baudrate 115200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import pty
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tty
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from ingeniumpy import IngeniumAPI
+from ingeniumpy.objects import IngActuator, IngAirSensor, IngBusingRegulator, IngComponent, IngComponentType, \
+    IngMeterBus, IngSif
+
+from . import six_low_pan
+from .six_low_pan import SixLowPan
+
+READ_CHUNK = 64
+
+
+class SimulatedNode:
+    """Remote 6LoWPAN node attached to the master side of a pty.
+
+    The link opens ``port``, a symlink to the current slave device, so the
+    node can hang up and come back on a fresh pty like a real radio would.
+    """
+
+    def __init__(self, baudrate: Optional[int] = None, drop_rate: float = 0.0,
+                 corrupt_rate: float = 0.0, seed: Optional[int] = None):
+        self.baudrate = baudrate
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.random = random.Random(seed)
+        self.lines: List[Tuple[float, bytes]] = []
+        self.dropped = 0
+        self.corrupted = 0
+        self.master_fd: Optional[int] = None
+        self.slave_fd: Optional[int] = None
+        self.link_dir = tempfile.mkdtemp(prefix="ingenium6lp-")
+        self.port = os.path.join(self.link_dir, "ttyS6LP")
+        self._buffer = b""
+        self._resume: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def open(self):
+        self._loop = asyncio.get_running_loop()
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+
+        tmp = self.port + ".new"
+        os.symlink(os.ttyname(self.slave_fd), tmp)
+        os.replace(tmp, self.port)
+
+        self._buffer = b""
+        self._loop.add_reader(self.master_fd, self._on_readable)
+
+    def close(self):
+        if self.master_fd is None:
+            return
+        if self._resume is not None:
+            self._resume.cancel()
+            self._resume = None
+        self._loop.remove_reader(self.master_fd)
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+        self.master_fd = None
+        self.slave_fd = None
+
+    def cleanup(self):
+        self.close()
+        shutil.rmtree(self.link_dir, ignore_errors=True)
+
+    async def send(self, data: str):
+        """Send a command line back to the integration."""
+        line = self._mangle((data + "\r\n").encode())
+        if line is None:
+            return
+        os.write(self.master_fd, line)
+        if self.baudrate:
+            await asyncio.sleep(len(line) * 10 / self.baudrate)
+
+    def frames(self) -> List[Tuple[float, dict]]:
+        """Received lines that still parse as JSON, with their arrival time."""
+        result = []
+        for arrival, line in self.lines:
+            try:
+                result.append((arrival, json.loads(line)))
+            except ValueError:
+                pass
+        return result
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.master_fd, READ_CHUNK)
+        except OSError:
+            return
+
+        if self.baudrate:
+            # 8N1 framing: ten bits on the wire per byte
+            self._loop.remove_reader(self.master_fd)
+            self._resume = self._loop.call_later(len(data) * 10 / self.baudrate, self._resume_reading)
+
+        self._buffer += data
+        while b"\n" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            line = self._mangle(line.rstrip(b"\r"))
+            if line is not None:
+                self.lines.append((time.monotonic(), line))
+
+    def _resume_reading(self):
+        self._resume = None
+        if self.master_fd is not None:
+            self._loop.add_reader(self.master_fd, self._on_readable)
+
+    def _mangle(self, line: bytes) -> Optional[bytes]:
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            self.dropped += 1
+            return None
+        if line and self.corrupt_rate and self.random.random() < self.corrupt_rate:
+            self.corrupted += 1
+            i = self.random.randrange(len(line))
+            line = line[:i] + bytes([line[i] ^ 0x5A]) + line[i + 1:]
+        return line
+
+
+class LinkHarness:
+    """SixLowPan wired to a SimulatedNode for the lifetime of a context."""
+
+    def __init__(self, api=None, **node_options):
+        self.node = SimulatedNode(**node_options)
+        self.api = api
+        self.link: Optional[SixLowPan] = None
+        self.sent: Dict[int, float] = {}
+        self.seq = 0
+
+    async def __aenter__(self) -> "LinkHarness":
+        self.node.open()
+        hass = SimpleNamespace(loop=asyncio.get_running_loop())
+        self.link = SixLowPan(hass, {}, port=self.node.port)
+        if self.api is not None:
+            await self.link.async_init(self.api)
+        else:
+            await self.link.async_start()
+        await self.wait_connected()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.link.async_stop()
+        self.node.cleanup()
+
+    async def wait_connected(self, timeout: float = 10):
+        deadline = time.monotonic() + timeout
+        while self.link.serial_writer is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"link did not open {self.node.port}")
+            await asyncio.sleep(0.01)
+
+    def send_frame(self) -> int:
+        seq = self.seq
+        self.seq += 1
+        self.sent[seq] = time.monotonic()
+        self.link.write_string(json.dumps({"type": "BEN", "id": seq}))
+        return seq
+
+    def latencies(self) -> List[float]:
+        return [arrival - self.sent[f["id"]] for arrival, f in self.node.frames() if f.get("id") in self.sent]
+
+    async def settle(self, quiet: float = 0.5, timeout: float = 30):
+        """Wait until the write queue is empty and the node stops receiving."""
+        deadline = time.monotonic() + timeout
+        count = -1
+        while time.monotonic() < deadline:
+            if not self.link.write_queue and count == len(self.node.lines):
+                return
+            count = len(self.node.lines)
+            await asyncio.sleep(quiet)
+
+
+def bench_api(per_kind: int) -> IngeniumAPI:
+    """Unloaded IngeniumAPI holding ``per_kind`` real objects of each kind SixLowPan forwards."""
+    api = IngeniumAPI()
+    addresses = itertools.count(1)
+
+    def make(cls, ctype: IngComponentType):
+        address = next(addresses)
+        comp = IngComponent({"id": f"bench{address}", "label": f"Bench {address}", "output": 0, "icon": 0})
+        return cls(api, False, address, ctype, comp, comp.label)
+
+    api._objects = [
+        make(cls, ctype)
+        for cls, ctype in [
+            (IngSif, IngComponentType.COD_TSIF),
+            (IngMeterBus, IngComponentType.COD_METERBUS),
+            (IngAirSensor, IngComponentType.COD_AIR_QUALITY),
+            (IngActuator, IngComponentType.COD2E2S),
+            (IngBusingRegulator, IngComponentType.COD2S300),
+        ]
+        for _ in range(per_kind)
+    ]
+    return api
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values) * 1000,
+        "p50_ms": values[len(values) // 2] * 1000,
+        "p95_ms": values[int(len(values) * 0.95) - 1] * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+
+
+async def bench_latency(frames: int = 200, interval: float = 0.02, **node_options) -> dict:
+    """End-to-end time from enqueue to arrival at the node, one frame at a time."""
+    async with LinkHarness(**node_options) as h:
+        for _ in range(frames):
+            h.send_frame()
+            await asyncio.sleep(interval)
+        await h.settle()
+        result = _summary(h.latencies())
+        result["lost"] = frames - result["count"]
+    return result
+
+
+async def bench_throughput(duration: float = 5, depth: int = 64, **node_options) -> dict:
+    """Sustained frames per second with the write queue kept non-empty."""
+    async with LinkHarness(**node_options) as h:
+        start = time.monotonic()
+        while time.monotonic() - start < duration:
+            while len(h.link.write_queue) < depth:
+                h.send_frame()
+            await asyncio.sleep(0.001)
+        received = len(h.node.lines)
+        elapsed = time.monotonic() - start
+    return {"frames": received, "seconds": elapsed, "fps": received / elapsed}
+
+
+async def bench_overload(burst: int = 2000, **node_options) -> dict:
+    """Enqueue a burst far beyond the queue size and see what survives."""
+    async with LinkHarness(**node_options) as h:
+        start = time.monotonic()
+        for _ in range(burst):
+            h.send_frame()
+        queued = len(h.link.write_queue)
+        await h.settle()
+        ids = [f["id"] for _, f in h.node.frames()]
+    return {
+        "burst": burst,
+        "queued_after_burst": queued,
+        "delivered": len(ids),
+        "evicted": burst - len(ids) - h.node.dropped - h.node.corrupted,
+        "first_delivered": ids[0] if ids else None,
+        "drain_seconds": time.monotonic() - start,
+    }
+
+
+async def bench_reconnect(rounds: int = 5, interval: float = 0.01, timeout: float = 30,
+                          **node_options) -> dict:
+    """Time from the node hanging up until a new frame gets through again."""
+    times = []
+    async with LinkHarness(**node_options) as h:
+        for _ in range(rounds):
+            h.node.close()
+            start = time.monotonic()
+            h.node.open()
+            first = h.seq
+            while time.monotonic() - start < timeout:
+                if any(f.get("id", -1) >= first for _, f in h.node.frames()):
+                    times.append(time.monotonic() - start)
+                    break
+                h.send_frame()
+                await asyncio.sleep(interval)
+            await h.settle(quiet=0.1)
+    result = _summary(times)
+    result["failed"] = rounds - len(times)
+    return result
+
+
+async def bench_fanout(per_kind: int = 4, rounds: int = 2000, **node_options) -> dict:
+    """Check every registered update callback delivers a frame, then time them."""
+    api = bench_api(per_kind)
+    async with LinkHarness(api=api, **node_options) as h:
+        # Go through update_notify, the same path ingeniumpy takes on a state change
+        callbacks = sum(len(h.link.notify.get(obj, ())) for obj in api.objects)
+        for obj in api.objects:
+            obj.update_notify()
+        await h.settle()
+        delivered = {f.get("id") for _, f in h.node.frames()}
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for obj in api.objects:
+                obj.update_notify()
+        elapsed = time.perf_counter() - start
+        h.link.write_queue.clear()
+    return {
+        "callbacks": callbacks,
+        "delivered": len(delivered),
+        "undelivered": callbacks - len(delivered),
+        "us_per_update": elapsed / (rounds * callbacks) * 1e6,
+    }
+
+
+async def async_main(args: argparse.Namespace):
+    node_options = {
+        "baudrate": args.baudrate,
+        "drop_rate": args.drop,
+        "corrupt_rate": args.corrupt,
+        "seed": args.seed,
+    }
+    for name, bench in [
+        ("fanout", bench_fanout),
+        ("latency", bench_latency),
+        ("throughput", bench_throughput),
+        ("overload", bench_overload),
+        ("reconnect", bench_reconnect),
+    ]:
+        result = await bench(**node_options)
+        print(f"{name}: {json.dumps(result, default=float)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baudrate", type=int, default=six_low_pan.SERIAL_BAUDRATE,
+                        help="throttle the node to this line rate (0 for unthrottled)")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability of dropping a line")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="probability of corrupting a line")
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,10 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from ingeniumpy import IngeniumAPI
 from ingeniumpy.objects import IngActuator
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_API, DATA_FRESHNESS, DATA_SCHEDULER, DATA_PROFILER
+from .freshness import FreshnessIndex
+from .profiler import StartupProfiler
+from .scheduler import CommandScheduler, context_priority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,14 +22,21 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback
 ):
     """Set up switch devices."""
-    api: IngeniumAPI = hass.data[DOMAIN][entry.entry_id]
+    data = hass.data[DOMAIN][entry.entry_id]
+    api: IngeniumAPI = data[DATA_API]
+    freshness: FreshnessIndex = data[DATA_FRESHNESS]
+    scheduler: CommandScheduler = data[DATA_SCHEDULER]
+    profiler: StartupProfiler = data[DATA_PROFILER]
 
-    async_add_entities([IngSwitch(o) for o in api.get_switches()])
+    with profiler.phase("entities.switch"):
+        async_add_entities([IngSwitch(o, freshness, scheduler) for o in api.get_switches()])
 
 
 class IngSwitch(SwitchEntity):
-    def __init__(self, obj: IngActuator):
+    def __init__(self, obj: IngActuator, freshness: FreshnessIndex, scheduler: CommandScheduler):
         self._obj = obj
+        self._freshness = freshness
+        self._scheduler = scheduler
         self._attr_unique_id = f"{DOMAIN}.{obj.component.id}"
         self._attr_name = obj.component.label
         self._attr_device_class = (
@@ -48,7 +58,7 @@ class IngSwitch(SwitchEntity):
 
     @property
     def available(self) -> bool:
-        return self._obj.available
+        return self._obj.available and self._freshness.is_fresh(self._obj.address)
 
     @property
     def is_on(self):
@@ -57,11 +67,11 @@ class IngSwitch(SwitchEntity):
 
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        await self._obj.action_switch()
+        await self._scheduler.run(context_priority(self._context), self._obj.action_switch)
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        await self._obj.action_switch()
+        await self._scheduler.run(context_priority(self._context), self._obj.action_switch)
 
     @property
     def extra_state_attributes(self):